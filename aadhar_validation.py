@@ -1,49 +1,71 @@
 import re
-from datetime import datetime
+from datetime import date, datetime
+from itertools import islice, product
+
+_AADHAAR_RE = re.compile(r"\b\d{4}\s\d{4}\s\d{4}\b|\b\d{12}\b")
+_DATE_RE = re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]?\d{4})')
+_DOB_LABEL_RE = re.compile(r'\b(dob|date of birth|dateofbirth|d\.o\.b)\b', re.I)
+_ISSUE_RE = re.compile(r'issue|issued|printed|valid from|expiry|exp', re.I)
+_NON_DATE_CHARS_RE = re.compile(r'[^0-9/\- ]')
+_NORMALIZE_DATE_FALLBACK_RE = re.compile(r'(\d{1,2})[/-]?(\d{1,2})[/-]?(\d{4})')
+_GENDER_RE = re.compile(r'\b(Male|Female)\b', re.I)
+_DOB_TRANSLATE = str.maketrans({
+    'o': '0', 'O': '0',
+    'b': '8', 'B': '8',
+    's': '5', 'S': '5',
+    'e': '6', 'E': '6',
+    'l': '1', 'L': '1',
+    'i': '1', 'I': '1',
+    'z': '2', 'Z': '2'
+})
 
 def extract_aadhaar_number(text):
-    match = re.search(r"\b\d{4}\s\d{4}\s\d{4}\b|\b\d{12}\b", text)
+    match = _AADHAAR_RE.search(text)
     return match.group().replace(" ", "") if match else None
 
 def clean_possible_dob(text):
-    repl = {
-        'o': '0', 'O': '0',
-        'b': '8', 'B': '8',
-        's': '5', 'S': '5',
-        'e': '6', 'E': '6',
-        'l': '1', 'L': '1',
-        'i': '1', 'I': '1',
-        'z': '2', 'Z': '2'
-    }
-    for k, v in repl.items():
-        text = text.replace(k, v)
+    return _NON_DATE_CHARS_RE.sub('', text.translate(_DOB_TRANSLATE))
 
-    text = re.sub(r'[^0-9/\- ]', '', text)
-    return text
+_DOB_LABELS = ('dob', 'date of birth', 'dateofbirth', 'd.o.b')
+
+def _valid_label_date(cand):
+    m = _DATE_RE.search(cand)
+    if not m:
+        return None
+    norm = _normalize_date(m.group(1))
+    try:
+        d, mo, y = norm.split('/')
+        di = int(d); mi = int(mo)
+        if 1 <= di <= 31 and 1 <= mi <= 12:
+            return norm
+    except:
+        pass
+    return None
 
 def extract_dob(text):
     lines = text.splitlines()
-    date_pattern = re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]?\d{4})')
 
     for line in lines:
-        if re.search(r'\b(dob|date of birth|dateofbirth|d\.o\.b)\b', line, re.I):
-            candidates = _generate_date_candidates(line)
-            for cand in candidates:
-                m = date_pattern.search(cand)
-                if m:
-                    norm = _normalize_date(m.group(1))
-                    try:
-                        d, mo, y = norm.split('/')
-                        di = int(d); mi = int(mo)
-                        if 1 <= di <= 31 and 1 <= mi <= 12:
-                            return norm
-                    except:
-                        continue
-    all_matches = date_pattern.finditer(text)
+        low = line.lower()
+        # cheap substring prefilter before the word-bounded label regex
+        if not any(tok in low for tok in _DOB_LABELS) or not _DOB_LABEL_RE.search(line):
+            continue
+        # Without e/E, the first expanded candidate is exactly the cleaned line
+        # (every other ambiguous char's first choice matches _DOB_TRANSLATE),
+        # so try it before expanding. 'e' is expanded 8-first, so leave it.
+        if 'e' not in low:
+            norm = _valid_label_date(clean_possible_dob(line))
+            if norm:
+                return norm
+        for cand in _generate_date_candidates(line):
+            norm = _valid_label_date(cand)
+            if norm:
+                return norm
+    all_matches = _DATE_RE.finditer(text)
     for m in all_matches:
         span_start = max(0, m.start() - 20)
         window = text[span_start:m.end() + 20]
-        if re.search(r'issue|issued|printed|valid from|expiry|exp', window, re.I):
+        if _ISSUE_RE.search(window):
             continue
         return _normalize_date(m.group(1))
 
@@ -61,7 +83,7 @@ def _normalize_date(date_str):
         m = parts[1][:2]
         y = parts[1][2:]
     else:
-        mobj = re.search(r'(\d{1,2})[/-]?(\d{1,2})[/-]?(\d{4})', date_str)
+        mobj = _NORMALIZE_DATE_FALLBACK_RE.search(date_str)
         if not mobj:
             return date_str
         d, m, y = mobj.group(1), mobj.group(2), mobj.group(3)
@@ -72,31 +94,37 @@ def _normalize_date(date_str):
 
 def _generate_date_candidates(raw_line, max_comb=64):
     amb = {
-        'o': ['0'], 'O': ['0'],
-        'b': ['8'], 'B': ['8'],
-        's': ['5', '8'], 'S': ['5', '8'],
-        'e': ['8', '6'], 'E': ['8', '6'],
-        'l': ['1'], 'L': ['1'],
-        'i': ['1'], 'I': ['1'],
-        'z': ['2'], 'Z': ['2']
+        'o': b'0', 'O': b'0',
+        'b': b'8', 'B': b'8',
+        's': b'58', 'S': b'58',
+        'e': b'86', 'E': b'86',
+        'l': b'1', 'L': b'1',
+        'i': b'1', 'I': b'1',
+        'z': b'2', 'Z': b'2'
     }
 
-    chars = list(raw_line)
-    indices = [i for i, ch in enumerate(chars) if ch in amb]
-    # limit combinations
+    # only expand ambiguous chars in/near date-shaped windows; the mapping is
+    # 1:1 so offsets in the translated line line up with raw_line
+    windows = [(m.start() - 2, m.end() + 2)
+               for m in _DATE_RE.finditer(raw_line.translate(_DOB_TRANSLATE))]
+    indices = [i for i, ch in enumerate(raw_line)
+               if ch in amb and any(lo <= i < hi for lo, hi in windows)]
     if not indices:
         return [clean_possible_dob(raw_line)]
 
-    from itertools import product
-    choices = [amb[chars[i]] for i in indices]
+    # non latin-1 chars become '?' (one byte each), which the cleanup drops
+    buf = bytearray(raw_line, 'latin-1', 'replace')
+    choices = [amb[raw_line[i]] for i in indices]
     candidates = []
-    for combo in product(*choices):
-        for idx, repl in zip(indices, combo):
-            chars[idx] = repl
-        cand = ''.join(chars)
-        candidates.append(clean_possible_dob(cand))
-        if len(candidates) >= max_comb:
-            break
+    # product() varies the rightmost positions fastest, so only patch the
+    # bytes that differ from the previous combination
+    prev = (None,) * len(indices)
+    for combo in islice(product(*choices), max_comb):
+        for idx, old, new in zip(indices, prev, combo):
+            if old != new:
+                buf[idx] = new
+        prev = combo
+        candidates.append(clean_possible_dob(buf.decode('latin-1')))
 
     # also include a fully cleaned original as fallback
     candidates.append(clean_possible_dob(raw_line))
@@ -106,18 +134,16 @@ def _generate_date_candidates(raw_line, max_comb=64):
 def is_age_above_18(dob_str):
     try:
         dob_clean = dob_str.replace('-', '/')
-        dob = datetime.strptime(dob_clean, "%d/%m/%Y")
-        age = (datetime.now() - dob).days // 365
+        dob = datetime.strptime(dob_clean, "%d/%m/%Y").date()
+        today = date.today()
+        age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
         return age >= 18
     except:
         return False
 
 
 def extract_gender(text):
-    if "Male" in text:
-        return "Male"
-    if "Female" in text:
-        return "Female"
-    return None
+    m = _GENDER_RE.search(text)
+    return m.group(1).capitalize() if m else None
 
 
@@ -1,16 +1,19 @@
 import sys
-import io
+import asyncio
+import functools
 import logging
 import uuid
 import os
 import re
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from PIL import Image
+from pydantic import BaseModel
 
 # Serverless-friendly: No MongoDB, No ML models (they're too heavy for Vercel)
 # This is a minimal demo version for Vercel deployment
@@ -28,16 +31,40 @@ app.add_middleware(
 logger = logging.getLogger("kyc")
 
 _ALLOWED_EXTS = {"jpg", "jpeg", "png"}
+_PHONE_RE = re.compile(r"^\+?[1-9]\d{1,14}$")
+_MAGIC_BYTES = {
+    "jpg": b"\xff\xd8\xff",
+    "jpeg": b"\xff\xd8\xff",
+    "png": b"\x89PNG\r\n\x1a\n",
+}
+_IMAGE_SIGNATURES = tuple(set(_MAGIC_BYTES.values()))
+_SNIFF_LEN = max(map(len, _IMAGE_SIGNATURES))
 
 
 # ---------- HELPERS ----------
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
 def _file_ext(filename: str) -> str:
     if not filename or "." not in filename:
         return ""
     return filename.rsplit(".", 1)[-1].lower().strip()
 
 
-def _validate_image_bytes(field: str, filename: str, content_type: str, content: bytes) -> str:
+def _needs_pil_verify(upload: UploadFile) -> bool:
+    """PIL verify() runs on every upload with STRICT_IMAGE_VALIDATION=1, otherwise only when the header isn't a JPEG/PNG signature."""
+    if _env_flag("STRICT_IMAGE_VALIDATION"):
+        return True
+    upload.file.seek(0)
+    head = upload.file.read(_SNIFF_LEN)
+    upload.file.seek(0)
+    return not head.startswith(_IMAGE_SIGNATURES)
+
+
+def _validate_image_stream(field: str, upload: UploadFile) -> str:
+    filename = upload.filename
+    content_type = upload.content_type
     ext = _file_ext(filename)
     if ext not in _ALLOWED_EXTS:
         raise HTTPException(
@@ -61,9 +88,19 @@ def _validate_image_bytes(field: str, filename: str, content_type: str, content:
             },
         )
 
+    # Cheap header sniff: any JPEG/PNG signature is accepted whatever the
+    # extension says (renamed files are common). Anything else, or every
+    # upload in strict mode, goes through PIL's verify().
     try:
-        Image.open(io.BytesIO(content)).verify()
+        if _needs_pil_verify(upload):
+            upload.file.seek(0)
+            Image.open(upload.file).verify()
+        upload.file.seek(0)
+        valid = True
     except Exception:
+        valid = False
+
+    if not valid:
         raise HTTPException(
             status_code=400,
             detail={
@@ -76,6 +113,13 @@ def _validate_image_bytes(field: str, filename: str, content_type: str, content:
     return ext
 
 
+@functools.lru_cache(maxsize=1)
+def _twilio_client(account_sid: str, auth_token: str):
+    """Reuse one Twilio client (and its HTTP session) across warm invocations."""
+    from twilio.rest import Client
+    return Client(account_sid, auth_token)
+
+
 def send_sms_notification(phone: str, report: dict) -> dict:
     """Send SMS via Twilio. Works on Vercel if env vars are set."""
     
@@ -84,7 +128,7 @@ def send_sms_notification(phone: str, report: dict) -> dict:
     from_phone = os.getenv("TWILIO_PHONE_NUMBER")
     
     # Validate phone
-    if not phone or not re.match(r"^\+?[1-9]\d{1,14}$", phone.strip()):
+    if not phone or not _PHONE_RE.match(phone.strip()):
         return {"sent": False, "detail": f"Invalid phone format: {phone}. Use +919876543210"}
     
     # Check config
@@ -97,9 +141,7 @@ def send_sms_notification(phone: str, report: dict) -> dict:
     message = f"KYC Verification Complete\nStatus: {status}\nFace Match: {similarity}"
     
     try:
-        from twilio.rest import Client
-        client = Client(account_sid, auth_token)
-        msg = client.messages.create(
+        msg = _twilio_client(account_sid, auth_token).messages.create(
             body=message,
             from_=from_phone,
             to=phone
@@ -111,16 +153,38 @@ def send_sms_notification(phone: str, report: dict) -> dict:
         return {"sent": False, "detail": f"SMS failed: {type(e).__name__}: {str(e)}"}
 
 
-# ---------- ROUTES ----------
-@app.get("/", response_class=HTMLResponse)
-def serve_ui():
+def _read_index_html() -> str:
     html_path = Path(__file__).parent.parent / "index.html"
     if not html_path.exists():
         return "<h1>index.html not found</h1>"
     return html_path.read_text(encoding="utf-8")
 
 
-@app.post("/kyc-verify")
+# Read once per cold start; set KYC_RELOAD_UI=1 to re-read on every request while editing
+_INDEX_HTML = _read_index_html()
+
+
+# ---------- MODELS ----------
+# Declaring the response model lets FastAPI serialize straight to JSON bytes
+# through Pydantic instead of jsonable_encoder + json.dumps.
+class KYCVerifyResponse(BaseModel):
+    status: str
+    message: str
+    files_received: Dict[str, Optional[str]]
+    phone: str
+    note: str
+    sms_notification: Dict[str, Any]
+
+
+# ---------- ROUTES ----------
+@app.get("/", response_class=HTMLResponse)
+def serve_ui():
+    if _env_flag("KYC_RELOAD_UI"):
+        return _read_index_html()
+    return _INDEX_HTML
+
+
+@app.post("/kyc-verify", response_model=KYCVerifyResponse)
 async def verify_kyc(
     aadhaar: UploadFile = File(...),
     pan: UploadFile = File(...),
@@ -136,14 +200,26 @@ async def verify_kyc(
     - No email notifications
     """
     
-    # ---------- READ & VALIDATE FILES ----------
-    aadhaar_bytes = await aadhaar.read()
-    pan_bytes = await pan.read()
-    selfie_bytes = await selfie.read()
-
-    aadhaar_ext = _validate_image_bytes("aadhaar", aadhaar.filename, aadhaar.content_type, aadhaar_bytes)
-    pan_ext = _validate_image_bytes("pan", pan.filename, pan.content_type, pan_bytes)
-    selfie_ext = _validate_image_bytes("selfie", selfie.filename, selfie.content_type, selfie_bytes)
+    # ---------- VALIDATE FILES ----------
+    uploads = (("aadhaar", aadhaar), ("pan", pan), ("selfie", selfie))
+    if any(_needs_pil_verify(upload) for _, upload in uploads):
+        # PIL verify is blocking; run the three checks off the event loop together
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(None, _validate_image_stream, field, upload)
+                for field, upload in uploads
+            ),
+            return_exceptions=True,
+        )
+        # report the first bad upload in field order, same as the sequential checks did
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    else:
+        # header sniffing only reads a few bytes; not worth a thread hop
+        results = [_validate_image_stream(field, upload) for field, upload in uploads]
+    aadhaar_ext, pan_ext, selfie_ext = results
 
     # ---------- SEND SMS NOTIFICATION ----------
     sms_result = send_sms_notification(phone, {
@@ -21,21 +21,50 @@ except errors.ServerSelectionTimeoutError:
             self.inserted_id = inserted_id
 
     class LocalFallbackDB:
+        INDEXED_FIELDS = ("_id", "email", "aadhaar", "aadhaar_id")
+
         def __init__(self):
-            self.storage = []
+            self.storage = {}
+            self.indexes = {k: {} for k in self.INDEXED_FIELDS}
+            self._next_id = 0
 
         def insert_one(self, data):
             data = dict(data)
             data["_local_saved_at"] = datetime.utcnow()
-            self.storage.append(data)
-            return InsertOneResult(len(self.storage) - 1)
+            idx = self._next_id
+            self._next_id += 1
+            self.storage[idx] = data
+            for k, index in self.indexes.items():
+                if k in data:
+                    try:
+                        index.setdefault(data[k], []).append(idx)
+                    except TypeError:
+                        # unhashable value, only reachable through the linear scan
+                        pass
+            return InsertOneResult(idx)
 
         def find(self, *args, **kwargs):
-            return list(self.storage)
+            return list(self.storage.values())
+
+        def _candidates(self, query):
+            indexed = [k for k in query if k in self.indexes]
+            # {"field": None} also matches documents without the field, which
+            # the index doesn't record; scan for those
+            if not indexed or any(query[k] is None for k in indexed):
+                return self.storage.values()
+            ids = None
+            for k in indexed:
+                try:
+                    hits = set(self.indexes[k].get(query[k], ()))
+                except TypeError:
+                    return self.storage.values()
+                ids = hits if ids is None else ids & hits
+            # keep insertion order so the first inserted match wins, as before
+            return [self.storage[i] for i in sorted(ids)]
 
         def find_one(self, query, projection=None):
             # simple matching for equality on top-level keys
-            for doc in self.storage:
+            for doc in self._candidates(query):
                 ok = True
                 for k, v in query.items():
                     if doc.get(k) != v:
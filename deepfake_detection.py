@@ -3,6 +3,7 @@ Deepfake Detection Module using Computer Vision and Deep Learning
 Detects AI-generated or manipulated faces in selfie images
 """
 
+import functools
 import numpy as np
 from pathlib import Path
 
@@ -14,18 +15,49 @@ def _require_cv2():
         return None
 
 
-def analyze_image_quality(image_path):
+@functools.lru_cache(maxsize=1)
+def _cascades():
+    """Load the Haar face/eye cascades once per process (callers ensure cv2 exists)."""
+    cv2 = _require_cv2()
+    face_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    )
+    eye_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + "haarcascade_eye.xml"
+    )
+    return face_cascade, eye_cascade
+
+
+_MAX_SIDE = 640
+
+
+def _downscale(cv2, img, max_side=_MAX_SIDE):
+    """Shrink so the long side is at most max_side; smaller images are left alone."""
+    h, w = img.shape[:2]
+    s = max_side / max(h, w)
+    if s >= 1:
+        return img
+    # explicit dsize so very thin images keep at least one pixel per side
+    size = (max(1, round(w * s)), max(1, round(h * s)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def analyze_image_quality(image_path=None, gray=None):
     cv2 = _require_cv2()
     if cv2 is None:
         return {"status": "disabled", "reason": "OpenCV not available"}
 
-    img = cv2.imread(str(image_path))
-    if img is None:
-        return {"error": "Could not read image"}
+    if gray is None:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            return {"error": "Could not read image"}
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-    noise_level = np.std(gray)
+    # 3x3 Laplacian of uint8 stays within +/-1020, so int16 output is exact
+    _, lap_std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    laplacian_var = lap_std[0, 0] ** 2
+    _, stddev = cv2.meanStdDev(gray)
+    noise_level = stddev[0, 0]
 
     return {
         "sharpness": float(laplacian_var),
@@ -33,16 +65,17 @@ def analyze_image_quality(image_path):
     }
 
 
-def detect_jpeg_artifacts(image_path):
+def detect_jpeg_artifacts(image_path=None, ycrcb=None):
     cv2 = _require_cv2()
     if cv2 is None:
         return 0.0
 
-    img = cv2.imread(str(image_path))
-    if img is None:
-        return 0.0
+    if ycrcb is None:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            return 0.0
+        ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
 
-    ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
     y_channel = ycrcb[:, :, 0]
     dct = cv2.dct(np.float32(y_channel))
 
@@ -52,31 +85,32 @@ def detect_jpeg_artifacts(image_path):
     return float(np.mean(high_freq))
 
 
-def check_face_consistency(image_path):
+def check_face_consistency(image_path=None, gray=None, eye_gray=None):
     cv2 = _require_cv2()
     if cv2 is None:
         return {"status": "disabled", "consistency_score": 0.0}
 
-    img = cv2.imread(str(image_path))
-    if img is None:
-        return {"error": "Could not read image"}
-
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    eye_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_eye.xml"
-    )
+    if gray is None:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            return {"error": "Could not read image"}
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    face_cascade, eye_cascade = _cascades()
     faces = face_cascade.detectMultiScale(gray, 1.3, 5)
 
     if len(faces) == 0:
         return {"face_detected": False, "eyes_detected": 0, "consistency_score": 0.0}
 
+    # faces may come from a downscaled copy; map the boxes onto eye_gray
+    # (the decoded resolution) so small eyes aren't lost
+    if eye_gray is None:
+        eye_gray = gray
+    r = eye_gray.shape[0] / gray.shape[0]
     eyes_count = 0
     for (x, y, w, h) in faces:
-        roi_gray = gray[y:y+h, x:x+w]
+        x, y, w, h = (int(round(v * r)) for v in (x, y, w, h))
+        roi_gray = eye_gray[y:y+h, x:x+w]
         eyes_count += len(eye_cascade.detectMultiScale(roi_gray))
 
     consistency = 1.0 if eyes_count == 2 else 0.5 if eyes_count > 0 else 0.0
@@ -87,16 +121,64 @@ def check_face_consistency(image_path):
     }
 
 
-def detect_color_anomalies(image_path):
+def detect_color_anomalies(image_path=None, hsv=None):
     cv2 = _require_cv2()
     if cv2 is None:
         return 0.0
 
-    img = cv2.imread(str(image_path))
-    if img is None:
-        return 0.0
+    if hsv is None:
+        img = cv2.imread(str(image_path))
+        if img is None:
+            return 0.0
+        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+    # one pass over the interleaved pixels instead of three strided channel slices
+    return float(np.std(hsv.reshape(-1, 3), axis=0).mean())
+
+
+def detect_deepfake(image_path):
+    """Run all checks on shared decodes of the selfie.
+
+    Gray-only checks use a full-resolution grayscale decode; colour checks
+    use a colour decode, at half resolution for large images so libjpeg
+    scales during the IDCT. Each colour space is converted once and shared
+    by the detectors. A BGR array that the caller already decoded is used
+    as-is.
+    """
+    cv2 = _require_cv2()
+    if cv2 is None:
+        return {"status": "disabled", "reason": "OpenCV not available"}
+
+    if isinstance(image_path, np.ndarray):
+        img = image_path
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    else:
+        # Gray stays at full resolution: eye detection and sharpness need it.
+        gray = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return {"error": "Could not read image"}
+        img = None
+        if max(gray.shape) >= 2 * _MAX_SIDE:
+            # still >= _MAX_SIDE at half size; let libjpeg scale in the IDCT
+            try:
+                img = cv2.imread(str(image_path), cv2.IMREAD_REDUCED_COLOR_2)
+            except cv2.error:
+                img = None
+        if img is None:
+            img = cv2.imread(str(image_path))
+        if img is None:
+            return {"error": "Could not read image"}
 
     hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    return float((np.std(hsv[:, :, 0]) +
-                  np.std(hsv[:, :, 1]) +
-                  np.std(hsv[:, :, 2])) / 3)
+
+    # Haar cascade and DCT cost scale with pixel count; run them at <=640px
+    small_gray = _downscale(cv2, gray)
+    small_ycrcb = cv2.cvtColor(_downscale(cv2, img), cv2.COLOR_BGR2YCrCb)
+
+    return {
+        "status": "success",
+        "quality": analyze_image_quality(gray=gray),
+        "jpeg_artifacts": detect_jpeg_artifacts(ycrcb=small_ycrcb),
+        "face_consistency": check_face_consistency(gray=small_gray, eye_gray=gray),
+        "color_variance": detect_color_anomalies(hsv=hsv),
+    }
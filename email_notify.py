@@ -1,30 +1,198 @@
+import logging
 import os
+import queue
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import re
 
 
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+\Z")
+
+logger = logging.getLogger("kyc")
+
+_BODY_TMPL = (
+    "Hello,\n"
+    "\n"
+    "Your KYC verification has been processed.\n"
+    "\n"
+    "Final status: {final_status}\n"
+    "Face similarity: {similarity}\n"
+    "{deepfake_section}"
+    "Regards,\n"
+    "AI KYC System"
+)
+
+_DEEPFAKE_TMPL = (
+    "\n"
+    "Deepfake analysis:\n"
+    "- Is deepfake: {is_deepfake}\n"
+    "- Authenticity score: {authenticity_score}\n"
+    "- Confidence: {confidence}\n"
+    "- Status: {status}\n"
+    "- Recommendation: {recommendation}\n"
+)
+_DEEPFAKE_KEYS = ("is_deepfake", "authenticity_score", "confidence", "status", "recommendation")
+
+# Shared by all requests so SMTP latency stays off the HTTP response path.
+_EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kyc-email")
+
+# Idle authenticated SMTP connections, keyed on (host, port, user, password, tls, ssl).
+# Connections are recycled after _SMTP_MAX_USES messages.
+_SMTP_POOL_SIZE = 4
+_SMTP_MAX_USES = 100
+_SMTP_POOLS: Dict[tuple, "queue.Queue[Tuple[smtplib.SMTP, int]]"] = {}
+_SMTP_POOLS_LOCK = threading.Lock()
+
+# KEY=VALUE lines; comments, blank lines and lines without "=" never match.
+_ENV_LINE_RE = re.compile(r"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=([^\n]*)$", re.MULTILINE)
+
+# path -> (mtime, parsed key/values); .env files are only re-parsed when they change.
+_ENV_CACHE: Dict[str, Tuple[float, Dict[str, str]]] = {}
+
+
 def _load_env_file(path: str) -> None:
     """Minimal .env loader (no dependency). Does not overwrite existing env vars."""
     try:
-        if not os.path.exists(path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
             return
-        with open(path, "r", encoding="utf-8") as f:
-            for raw in f.readlines():
-                line = raw.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                if key and key not in os.environ:
-                    os.environ[key] = value
+        cached = _ENV_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            parsed = cached[1]
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            parsed = {}
+            # first occurrence wins, matching the old line-by-line loader
+            for key, value in _ENV_LINE_RE.findall(text):
+                parsed.setdefault(key, value.strip().strip('"').strip("'"))
+            _ENV_CACHE[path] = (mtime, parsed)
+        for key, value in parsed.items():
+            os.environ.setdefault(key, value)
     except Exception:
         # Don't fail KYC because a .env file is malformed.
         return
 
 
+class _PipeliningMixin:
+    """Send MAIL/RCPT/DATA in one write when the server advertises PIPELINING (RFC 2920).
+
+    Falls back to the stock smtplib sequence when the extension is missing
+    or ESMTP options are needed (e.g. SMTPUTF8).
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn("pipelining") or mail_options or rcpt_options:
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode("ascii")
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        size = f" size={len(msg)}" if self.has_extn("size") else ""
+        commands = [f"mail FROM:{smtplib.quoteaddr(from_addr)}{size}"]
+        commands.extend(f"rcpt TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs)
+        commands.append("data")
+        self.send("".join(f"{c}\r\n" for c in commands))
+
+        # One reply per pipelined command, in order; read them all before acting.
+        mail_code, mail_resp = self.getreply()
+        refused = {}
+        for addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        data_code, data_resp = self.getreply()
+
+        if data_code == 354 and (mail_code != 250 or len(refused) == len(to_addrs)):
+            # Server accepted DATA anyway; end the empty message before resetting.
+            self.send(b".\r\n")
+            self.getreply()
+        if mail_code != 250:
+            self._rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(refused) == len(to_addrs):
+            self._rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if data_code != 354:
+            self._rset()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        q = smtplib._quote_periods(msg)
+        if q[-2:] != b"\r\n":
+            q += b"\r\n"
+        self.send(q + b".\r\n")
+        code, resp = self.getreply()
+        if code != 250:
+            self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+
+class _SMTP(_PipeliningMixin, smtplib.SMTP):
+    pass
+
+
+class _SMTP_SSL(_PipeliningMixin, smtplib.SMTP_SSL):
+    pass
+
+
+def _open_smtp(host: str, port: int, user: str, password: str, use_tls: bool, use_ssl: bool) -> smtplib.SMTP:
+    if use_ssl:
+        server = _SMTP_SSL(host, port, timeout=20)
+    else:
+        server = _SMTP(host, port, timeout=20)
+        server.ehlo()
+        if use_tls:
+            server.starttls()
+            server.ehlo()
+    server.login(user, password)
+    return server
+
+
+def _close_smtp(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def _smtp_pool(key: tuple) -> "queue.Queue[Tuple[smtplib.SMTP, int]]":
+    with _SMTP_POOLS_LOCK:
+        return _SMTP_POOLS.setdefault(key, queue.Queue(maxsize=_SMTP_POOL_SIZE))
+
+
+def _checkout_smtp(pool: "queue.Queue[Tuple[smtplib.SMTP, int]]", connect) -> Tuple[smtplib.SMTP, int]:
+    """Reuse an idle logged-in connection that still answers NOOP, else open a new one."""
+    while True:
+        try:
+            server, uses = pool.get_nowait()
+        except queue.Empty:
+            return connect(), 0
+        try:
+            if server.noop()[0] == 250:
+                return server, uses
+        except Exception:
+            pass
+        _close_smtp(server)
+
+
+def _checkin_smtp(pool: "queue.Queue[Tuple[smtplib.SMTP, int]]", server: smtplib.SMTP, uses: int) -> None:
+    if uses >= _SMTP_MAX_USES:
+        _close_smtp(server)
+        return
+    try:
+        pool.put_nowait((server, uses))
+    except queue.Full:
+        _close_smtp(server)
+
+
 def _get_bool_env(name: str, default: bool) -> bool:
     val = os.getenv(name)
     if val is None:
@@ -63,7 +231,7 @@ def send_kyc_email(
     use_tls = _get_bool_env("SMTP_USE_TLS", True)
     use_ssl = _get_bool_env("SMTP_USE_SSL", False)
 
-    if not to_email or not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", to_email.strip()):
+    if not to_email or not _EMAIL_RE.match(to_email.strip()):
         return {"sent": False, "detail": f"Invalid destination email: {to_email!r}"}
 
     if not smtp_host or not smtp_user or not smtp_pass or not smtp_from:
@@ -77,56 +245,33 @@ def send_kyc_email(
     msg["From"] = smtp_from
     msg["To"] = to_email
 
-    final_status = report.get("final_status", "UNKNOWN")
-    face_similarity = report.get("similarity", "N/A")
     deepfake = report.get("deepfake_analysis", {}) or {}
-
-    body_lines = [
-        "Hello,",
-        "",
-        "Your KYC verification has been processed.",
-        "",
-        f"Final status: {final_status}",
-        f"Face similarity: {face_similarity}",
-    ]
-
+    deepfake_section = ""
     if isinstance(deepfake, dict):
-        body_lines.extend(
-            [
-                "",
-                "Deepfake analysis:",
-                f"- Is deepfake: {deepfake.get('is_deepfake', 'N/A')}",
-                f"- Authenticity score: {deepfake.get('authenticity_score', 'N/A')}",
-                f"- Confidence: {deepfake.get('confidence', 'N/A')}",
-                f"- Status: {deepfake.get('status', 'N/A')}",
-                f"- Recommendation: {deepfake.get('recommendation', 'N/A')}",
-            ]
+        deepfake_section = _DEEPFAKE_TMPL.format_map(
+            {key: deepfake.get(key, "N/A") for key in _DEEPFAKE_KEYS}
         )
 
-    body_lines.extend(
-        [
-            "Regards,",
-            "AI KYC System",
-        ]
+    msg.set_content(
+        _BODY_TMPL.format(
+            final_status=report.get("final_status", "UNKNOWN"),
+            similarity=report.get("similarity", "N/A"),
+            deepfake_section=deepfake_section,
+        )
     )
 
-    msg.set_content("\n".join(body_lines))
-
+    pool = _smtp_pool((smtp_host, smtp_port, smtp_user, smtp_pass, use_tls, use_ssl))
+    server = None
     try:
-        if use_ssl:
-            with smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=20) as server:
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.ehlo()
-                if use_tls:
-                    server.starttls()
-                    server.ehlo()
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
+        server, uses = _checkout_smtp(
+            pool, lambda: _open_smtp(smtp_host, smtp_port, smtp_user, smtp_pass, use_tls, use_ssl)
+        )
+        server.send_message(msg)
+        _checkin_smtp(pool, server, uses + 1)
         return {"sent": True}
     except Exception as e:
+        if server is not None:
+            _close_smtp(server)
         return {
             "sent": False,
             "detail": f"Email send failed: {type(e).__name__}: {e}",
@@ -139,3 +284,29 @@ def send_kyc_email(
                 "to": to_email,
             },
         }
+
+
+def _log_email_result(future) -> None:
+    try:
+        result = future.result()
+    except Exception:
+        logger.exception("Background KYC email crashed")
+        return
+    if not result.get("sent"):
+        logger.warning("Background KYC email not sent: %s", result.get("detail"))
+
+
+def queue_kyc_email(
+    to_email: str,
+    report: Dict[str, Any],
+    subject: str = "Your KYC Verification Report",
+) -> Dict[str, Any]:
+    """Queue send_kyc_email on a background worker and return immediately.
+
+    Delivery failures are logged rather than returned to the caller.
+
+    Returns: {queued: True}
+    """
+    future = _EMAIL_EXECUTOR.submit(send_kyc_email, to_email, report, subject)
+    future.add_done_callback(_log_email_result)
+    return {"queued": True}
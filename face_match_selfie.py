@@ -1,5 +1,6 @@
-﻿import numpy as np
-from typing import Optional, Tuple, Dict, Any
+﻿import functools
+import numpy as np
+from typing import Optional, Tuple, Dict, Any, Union
 def run_face_match():
     try:
         import cv2
@@ -11,9 +12,81 @@ def run_face_match():
         }
 
 
-def preprocess_keep_aspect(image_path: str, max_side: int = 800) -> Optional[np.ndarray]:
+@functools.lru_cache(maxsize=1)
+def _require_face_libs():
+    """
+    Import cv2 and face_recognition once per process. Importing
+    face_recognition loads the dlib detector/landmark/encoder weights, so
+    caching it keeps model loading out of the per-request path.
+    Returns (None, None) if either is unavailable.
+    """
+    try:
+        import cv2
+        import face_recognition
+    except ImportError:
+        return None, None
+    return cv2, face_recognition
+
+
+def warmup() -> bool:
+    """Load the face models ahead of the first request; True if available."""
+    return _require_face_libs()[1] is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _require_turbojpeg():
+    """PyTurboJPEG handle (SIMD libjpeg-turbo), or None if it or the shared library is missing."""
+    try:
+        from turbojpeg import TurboJPEG
+        return TurboJPEG()
+    except Exception:
+        return None
+
+
+def _exif_orientation(data: bytes) -> int:
+    """EXIF Orientation tag of an encoded image (1 if absent); header-only parse."""
+    import io
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as im:
+        return im.getexif().get(0x0112, 1)
+
+
+def _decode_jpeg_scaled(image_path: str, max_side: int) -> Optional[np.ndarray]:
+    """Decode a JPEG to BGR with libjpeg-turbo, scaling down during the IDCT
+    as far as possible while the long side stays >= max_side.
+    Returns None for EXIF-rotated images (libjpeg-turbo ignores the tag,
+    cv2.imread applies it) so the caller falls back to cv2."""
+    tj = _require_turbojpeg()
+    if tj is None:
+        return None
+    try:
+        from turbojpeg import TJPF_BGR
+        with open(image_path, "rb") as f:
+            data = f.read()
+        if _exif_orientation(data) != 1:
+            return None
+        width, height = tj.decode_header(data)[:2]
+        factor = (1, 1)
+        for denom in (8, 4, 2):
+            if max(width, height) // denom >= max_side:
+                factor = (1, denom)
+                break
+        return tj.decode(data, pixel_format=TJPF_BGR, scaling_factor=factor)
+    except Exception:
+        return None
+
+
+def preprocess_keep_aspect(image_path: Union[str, np.ndarray], max_side: int = 800) -> Optional[np.ndarray]:
+    """Resize to max_side and convert to RGB. Accepts a path or an already decoded BGR array."""
     import cv2
-    img = cv2.imread(image_path)
+    if isinstance(image_path, np.ndarray):
+        img = image_path
+    else:
+        img = None
+        if str(image_path).lower().endswith((".jpg", ".jpeg")):
+            img = _decode_jpeg_scaled(image_path, max_side)
+        if img is None:
+            img = cv2.imread(image_path)
     if img is None:
         return None
     h, w = img.shape[:2]
@@ -22,21 +95,35 @@ def preprocess_keep_aspect(image_path: str, max_side: int = 800) -> Optional[np.
     img = cv2.resize(img, (new_w, new_h))
     img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
     return img
+def quantize_encoding(encoding: np.ndarray) -> np.ndarray:
+    """Compact int8 form of a unit-norm face encoding for storage (4x smaller than float32)."""
+    return np.clip(np.round(encoding * 127), -127, 127).astype(np.int8)
+
+
 def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     if a is None or b is None:
         return -1.0
+    # int8 dot products would overflow; widen quantized encodings first
+    if a.dtype == np.int8:
+        a = a.astype(np.int32)
+    if b.dtype == np.int8:
+        b = b.astype(np.int32)
+    eps = 1e-10
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + eps))
+
+
+def _cosine_similarity_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarity between the rows of a (N, d) and b (M, d) -> (N, M)."""
     eps = 1e-10
-    an = a / (np.linalg.norm(a) + eps)
-    bn = b / (np.linalg.norm(b) + eps)
-    return float(np.dot(an, bn))
+    norms = np.linalg.norm(a, axis=1)[:, None] * np.linalg.norm(b, axis=1)[None, :]
+    return (a @ b.T) / (norms + eps)
 
 
 def _largest_face_box(face_locations: list) -> Optional[Tuple[int, int, int, int]]:
     if not face_locations:
         return None
-    areas = [abs((b - t) * (r - l)) for (t, r, b, l) in face_locations]
-    idx = int(np.argmax(areas))
-    return face_locations[idx]
+    # boxes are (top, right, bottom, left) with top <= bottom and left <= right
+    return max(face_locations, key=lambda box: (box[2] - box[0]) * (box[1] - box[3]))
 
 
 def _crop_with_margin(image: np.ndarray, box: Tuple[int, int, int, int], margin: float = 0.25) -> np.ndarray:
@@ -50,23 +137,28 @@ def _crop_with_margin(image: np.ndarray, box: Tuple[int, int, int, int], margin:
     x2 = min(w, r + m)
     y2 = min(h, b + m)
     crop = image[y1:y2, x1:x2]
+    cv2, _ = _require_face_libs()
     if crop.size == 0:
         return cv2.resize(image, (256, 256))
     return cv2.resize(crop, (256, 256))
 
 
-def get_robust_encoding(image_path: str) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
-    debug: Dict[str, Any] = {"path": image_path, "found_locations": 0, "used_model": None, "encodings_count": 0}
+def get_robust_encoding(image_path: Union[str, np.ndarray]) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+    path = "<array>" if isinstance(image_path, np.ndarray) else image_path
+    debug: Dict[str, Any] = {"path": path, "found_locations": 0, "used_model": None, "encodings_count": 0}
+    _, face_recognition = _require_face_libs()
+    if face_recognition is None:
+        debug["error"] = "face_recognition_unavailable"
+        return None, debug
     image = preprocess_keep_aspect(image_path)
     if image is None:
         debug["error"] = "image_not_readable"
         return None, debug
 
-    # try several detection strategies
+    # HOG first (upsample=1 is the default, so a second identical HOG pass
+    # would only repeat the work), then fall back to CNN
     locs = face_recognition.face_locations(image, model="hog")
     debug["used_model"] = "hog"
-    if not locs:
-        locs = face_recognition.face_locations(image, number_of_times_to_upsample=1, model="hog")
     if not locs:
         try:
             locs = face_recognition.face_locations(image, model="cnn")
@@ -94,9 +186,19 @@ def get_robust_encoding(image_path: str) -> Tuple[Optional[np.ndarray], Dict[str
     avg = encs[0] / (np.linalg.norm(encs[0]) + 1e-10)
     return avg, debug
 
-def match_faces(pan_image: str, selfie_image: str, threshold: float = 0.6) -> Dict[str, Any]:
+def match_faces(
+    pan_image: str,
+    selfie_image: Optional[str] = None,
+    threshold: float = 0.6,
+    *,
+    selfie_enc: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    # Callers that already ran get_robust_encoding on the selfie pass it in
+    # so the detection + encoding pipeline is not repeated.
     pan_enc, pan_debug = get_robust_encoding(pan_image)
-    selfie_enc, selfie_debug = get_robust_encoding(selfie_image)
+    selfie_debug: Dict[str, Any] = {"path": selfie_image, "precomputed": selfie_enc is not None}
+    if selfie_enc is None and selfie_image is not None:
+        selfie_enc, selfie_debug = get_robust_encoding(selfie_image)
 
     if pan_enc is None:
         return {"status": "failed", "error": "No face detected in PAN image", "debug": pan_debug}
@@ -2,22 +2,30 @@ import re
 from typing import Any, Dict, List, Optional
 
 
-_PAN_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]")
+_PAN_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]", re.IGNORECASE)
 _AADHAAR_RE = re.compile(r"\b\d{4}\s\d{4}\s\d{4}\b|\b\d{12}\b")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]")
 
 
 def _alnum_len(s: str) -> int:
-    return len(re.sub(r"[^A-Za-z0-9]", "", s or ""))
+    return len(_NON_ALNUM_RE.sub("", s or ""))
+
+
+def _digit_count(s: str) -> int:
+    # str.count per digit runs in C and builds no intermediate list/string
+    return sum(map(s.count, "0123456789"))
 
 
 def looks_like_pan_text(text: str) -> bool:
-    if not text:
+    # a PAN is 10 characters, so shorter text cannot contain one
+    if not text or len(text) < 10:
         return False
-    return bool(_PAN_RE.search(text.upper()))
+    return bool(_PAN_RE.search(text))
 
 
 def looks_like_aadhaar_text(text: str) -> bool:
-    if not text:
+    # an Aadhaar number needs 12 digits; skip the full pattern if there aren't that many
+    if not text or _digit_count(text) < 12:
         return False
     return bool(_AADHAAR_RE.search(text))
 
@@ -27,13 +35,13 @@ def selfie_looks_like_document(text: str) -> bool:
     if not text:
         return False
 
-    t = text.upper()
-    if looks_like_pan_text(t) or looks_like_aadhaar_text(t):
+    if looks_like_pan_text(text) or looks_like_aadhaar_text(text):
         return True
 
     # Heuristic: selfies usually have very little machine-readable text.
     # If OCR returns lots of alnum characters, it's likely a card/document.
-    return _alnum_len(t) >= 35
+    # (Text shorter than the threshold can't qualify; skip building the stripped copy.)
+    return len(text) >= 35 and _alnum_len(text) >= 35
 
 
 def validate_kyc_slots(
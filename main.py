@@ -1,8 +1,11 @@
+import asyncio
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pathlib import Path
+import io
 import os
+import shutil
 import uuid
 from PIL import Image
 
@@ -22,46 +25,121 @@ app.add_middleware(
 BASE_DIR = Path(__file__).parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
+# JPEG, PNG
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
 
 for folder in ["aadhaar", "pan", "selfie"]:
     (UPLOAD_DIR / folder).mkdir(parents=True, exist_ok=True)
 
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "y", "on"}
+
 # -------------------- FRONTEND --------------------
 
-@app.get("/", response_class=HTMLResponse)
-def serve_ui():
+def _read_index_html():
     html_path = BASE_DIR / "index.html"
     if not html_path.exists():
         return "<h1>index.html not found</h1>"
     return html_path.read_text(encoding="utf-8")
 
+# Read once at startup; set KYC_RELOAD_UI=1 to re-read on every request while editing
+INDEX_HTML = _read_index_html()
+
+@app.get("/", response_class=HTMLResponse)
+def serve_ui():
+    if _env_flag("KYC_RELOAD_UI"):
+        return _read_index_html()
+    return INDEX_HTML
+
 # -------------------- HELPERS --------------------
 
-def validate_image(file: UploadFile):
-    if "." not in file.filename:
+def file_ext(filename: str) -> str:
+    return os.path.splitext(filename or "")[1][1:].lower()
+
+
+def validate_image(file: UploadFile, ext: str):
+    if not ext:
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    ext = file.filename.rsplit(".", 1)[1].lower()
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Only JPEG images are accepted")
 
+    # a few header bytes settle the format for JPEG/PNG, whatever the
+    # extension says; returns False when the saved file needs verify_image
+    file.file.seek(0)
+    head = file.file.read(8)
+    file.file.seek(0)
+    return head.startswith(IMAGE_SIGNATURES)
+
+
+def _needs_pil_verify(sniffed: bool) -> bool:
+    # second-line check when the sniff fails; on every upload in strict mode
+    return not sniffed or _env_flag("STRICT_IMAGE_VALIDATION")
+
+
+def verify_image(path: str):
+    # verify from the saved copy so the upload body isn't parsed from memory twice
     try:
-        Image.open(file.file).verify()
-        file.file.seek(0)
+        with Image.open(path) as img:
+            img.verify()
     except Exception:
         raise HTTPException(status_code=400, detail="Corrupted image")
 
 
-def save_file(file: UploadFile, folder: str):
-    ext = file.filename.rsplit(".", 1)[1]
+def _copy_upload(file: UploadFile, f):
+    file.file.seek(0)
+    try:
+        # uploads spooled to disk are copied in-kernel; fileno() on a
+        # still in-memory spool would force a rollover, so skip those
+        if not getattr(file.file, "_rolled", True):
+            raise io.UnsupportedOperation
+        in_fd = file.file.fileno()
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(f.fileno(), in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        # copy in 1 MiB chunks instead of holding the whole upload in memory
+        f.seek(0)
+        f.truncate()
+        file.file.seek(0)
+        shutil.copyfileobj(file.file, f, 1 << 20)
+
+
+def save_file(file: UploadFile, folder: str, ext: str):
     filename = f"{uuid.uuid4()}.{ext}"
     path = UPLOAD_DIR / folder / filename
 
-    with open(path, "wb") as f:
-        f.write(file.file.read())
+    # write under a temporary name and rename into place, so an aborted
+    # request never leaves a partial file at the final path
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            _copy_upload(file, f)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
     return str(path)
 
+
+def _process(file: UploadFile, folder: str):
+    ext = file_ext(file.filename)
+    sniffed = validate_image(file, ext)
+    path = save_file(file, folder, ext)
+    if not _needs_pil_verify(sniffed):
+        return path
+    try:
+        verify_image(path)
+    except HTTPException:
+        os.remove(path)
+        raise
+    return path
+
 # -------------------- API --------------------
 
 @app.post("/upload-kyc-documents")
@@ -70,13 +148,21 @@ async def upload_kyc_documents(
     pan: UploadFile = File(...),
     selfie: UploadFile = File(...)
 ):
-    validate_image(aadhaar)
-    validate_image(pan)
-    validate_image(selfie)
-
-    aadhaar_path = save_file(aadhaar, "aadhaar")
-    pan_path = save_file(pan, "pan")
-    selfie_path = save_file(selfie, "selfie")
+    # validation and copying block; handle the three documents off the event loop together
+    results = await asyncio.gather(
+        asyncio.to_thread(_process, aadhaar, "aadhaar"),
+        asyncio.to_thread(_process, pan, "pan"),
+        asyncio.to_thread(_process, selfie, "selfie"),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        # nothing is kept unless all three are valid, as with validate-then-save
+        for r in results:
+            if isinstance(r, str):
+                os.remove(r)
+        raise errors[0]
+    aadhaar_path, pan_path, selfie_path = results
 
     return {
         "message": "Documents uploaded successfully",
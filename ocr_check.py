@@ -1,47 +1,258 @@
+import functools
+import hashlib
+import os
+import queue
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 
+# Tesseract's OpenMP threading oversubscribes the CPU when several images are
+# OCR'd at once; run each engine single-threaded and parallelize per image
+# instead. Must be set before tesseract is loaded or spawned.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+_NUM_RE = re.compile(r"\d+")
+_PAN_LIKE_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]")
+_AADHAAR_LIKE_RE = re.compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b")
+
+# Images are shrunk so their long side is at most this before OCR; ID cards
+# stay legible well below phone-camera resolution and tesseract's cost grows
+# with pixel count.
+_OCR_MAX_SIDE = 1200
+
+# Images OCR'd concurrently by extract_text_batch (e.g. Aadhaar + PAN).
+_OCR_WORKERS = 2
+
+# OCR results keyed by a hash of the file contents, so re-uploads of the same
+# photo (KYC retries) skip tesseract. Bounded LRU, successful results only.
+_OCR_CACHE_SIZE = 256
+_OCR_CACHE = OrderedDict()
+_OCR_CACHE_LOCK = threading.Lock()
+
 
 def _require_ocr_libs():
     """
     Safely import OCR-related libraries.
-    Returns (cv2, pytesseract) or (None, None) if unavailable.
+    Returns (cv2, pytesseract); either is None if unavailable.
     """
     try:
         import cv2
-        import pytesseract
-        return cv2, pytesseract
     except ImportError:
         return None, None
+    try:
+        import pytesseract
+    except ImportError:
+        pytesseract = None
+    return cv2, pytesseract
+
+
+# PyTessBaseAPI is not thread-safe; each engine is used by one thread at a
+# time, checked out of this pool.
+_TESS_POOL = queue.LifoQueue()
+
+
+def _new_tess_api():
+    try:
+        from tesserocr import PyTessBaseAPI, PSM, OEM
+        return PyTessBaseAPI(lang="eng", psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_tess_api():
+    """
+    In-process Tesseract engines via tesserocr, created once so the language
+    model is loaded a single time per engine instead of per pytesseract
+    subprocess. Fills the pool with up to _OCR_WORKERS engines and returns
+    the first one, or None if tesserocr (or its traineddata) is unavailable.
+    """
+    first = _new_tess_api()
+    if first is None:
+        return None
+    _TESS_POOL.put(first)
+    for _ in range(_OCR_WORKERS - 1):
+        api = _new_tess_api()
+        if api is None:
+            break
+        _TESS_POOL.put(api)
+    return first
+
+
+def _ocr_image(cv2, gray, pytesseract):
+    """
+    Run OCR on a single-channel image, preferring a pooled tesserocr engine.
+    """
+    if _get_tess_api() is None:
+        # Hand tesseract a file path: pytesseract would otherwise wrap the
+        # array in PIL and zlib-encode a temporary PNG. PGM is raw pixels.
+        with tempfile.TemporaryDirectory() as tmp:
+            page = os.path.join(tmp, "page.pgm")
+            cv2.imwrite(page, gray)
+            return pytesseract.image_to_string(page)
+
+    from PIL import Image
+    api = _TESS_POOL.get()
+    try:
+        api.SetImage(Image.fromarray(gray))
+        return api.GetUTF8Text()
+    finally:
+        _TESS_POOL.put(api)
+
+
+def _preprocess(cv2, image_path):
+    """
+    Grayscale and downscale to _OCR_MAX_SIDE. Accepts a path or a decoded
+    BGR array; returns None if the image can't be read.
+    """
+    if isinstance(image_path, (str, os.PathLike)):
+        # decode straight to one channel instead of BGR + cvtColor
+        gray = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+    elif image_path is not None and image_path.ndim == 3:
+        gray = cv2.cvtColor(image_path, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image_path
+    if gray is None:
+        return None
+
+    h, w = gray.shape[:2]
+    scale = _OCR_MAX_SIDE / max(h, w)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    # no Otsu pass: the LSTM engine does better on grayscale, and tesseract
+    # binarizes internally where it needs to
+    return gray
+
+
+def _content_key(image_path):
+    """blake2b digest of the file at image_path; None for arrays or unreadable files."""
+    if not isinstance(image_path, (str, os.PathLike)):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def _cache_get(key):
+    if key is None:
+        return None
+    with _OCR_CACHE_LOCK:
+        result = _OCR_CACHE.get(key)
+        if result is None:
+            return None
+        _OCR_CACHE.move_to_end(key)
+    return dict(result)
+
+
+def _cache_put(key, result):
+    if key is None or result.get("status") != "success":
+        return
+    with _OCR_CACHE_LOCK:
+        _OCR_CACHE[key] = dict(result)
+        _OCR_CACHE.move_to_end(key)
+        if len(_OCR_CACHE) > _OCR_CACHE_SIZE:
+            _OCR_CACHE.popitem(last=False)
 
 
 def extract_text_from_image(image_path):
     """
     Extract raw text from an image using OCR.
+    Accepts a path or an already decoded BGR array.
     """
     cv2, pytesseract = _require_ocr_libs()
-    if cv2 is None or pytesseract is None:
+    if cv2 is None or (pytesseract is None and _get_tess_api() is None):
         return {
             "status": "disabled",
             "reason": "OCR not available in this environment",
             "text": ""
         }
 
-    img = cv2.imread(str(image_path))
-    if img is None:
+    key = _content_key(image_path)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    gray = _preprocess(cv2, image_path)
+    if gray is None:
         return {
             "error": "Could not read image",
             "text": ""
         }
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-
-    text = pytesseract.image_to_string(gray)
-    return {
+    text = _ocr_image(cv2, gray, pytesseract)
+    result = {
         "status": "success",
         "text": text.strip()
     }
+    _cache_put(key, result)
+    return result
+
+
+def _tesseract_list(pytesseract, tmp, chunk, n):
+    """OCR one group of page files in a single tesseract process."""
+    list_file = os.path.join(tmp, f"pages{n}.txt")
+    with open(list_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(page for _, page in chunk) + "\n")
+    # tesseract ends every page with a form feed
+    return pytesseract.image_to_string(list_file).split("\f")
+
+
+def extract_text_batch(image_paths):
+    """
+    OCR several images, returning one extract_text_from_image-style result
+    per input, in order. Images are OCR'd up to _OCR_WORKERS at a time with
+    single-threaded engines. Without tesserocr, pages are split across that
+    many tesseract processes, each handling its share through a list file so
+    startup and model loading are paid once per process rather than per image.
+    """
+    cv2, pytesseract = _require_ocr_libs()
+    if cv2 is not None and _get_tess_api() is not None:
+        with ThreadPoolExecutor(_OCR_WORKERS) as pool:
+            return list(pool.map(extract_text_from_image, image_paths))
+    if cv2 is None or pytesseract is None:
+        return [extract_text_from_image(p) for p in image_paths]
+
+    results = [{"error": "Could not read image", "text": ""} for _ in image_paths]
+    keys = [_content_key(p) for p in image_paths]
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        for i, image_path in enumerate(image_paths):
+            cached = _cache_get(keys[i])
+            if cached is not None:
+                results[i] = cached
+                continue
+            gray = _preprocess(cv2, image_path)
+            if gray is None:
+                continue
+            page = os.path.join(tmp, f"{i}.pgm")
+            cv2.imwrite(page, gray)
+            pages.append((i, page))
+        if not pages:
+            return results
+
+        size = -(-len(pages) // _OCR_WORKERS)
+        chunks = [pages[k:k + size] for k in range(0, len(pages), size)]
+        with ThreadPoolExecutor(len(chunks)) as pool:
+            outputs = list(pool.map(
+                functools.partial(_tesseract_list, pytesseract, tmp),
+                chunks, range(len(chunks)),
+            ))
+        if any(len(out) < len(chunk) for out, chunk in zip(outputs, chunks)):
+            return [extract_text_from_image(p) for p in image_paths]
+
+    for chunk, out in zip(chunks, outputs):
+        for (i, _), text in zip(chunk, out):
+            results[i] = {"status": "success", "text": text.strip()}
+            _cache_put(keys[i], results[i])
+    return results
 
 
 def extract_numbers(text):
@@ -51,7 +262,7 @@ def extract_numbers(text):
     if not text:
         return []
 
-    return re.findall(r"\d+", text)
+    return _NUM_RE.findall(text)
 
 
 def extract_pan_like(text):
@@ -62,8 +273,7 @@ def extract_pan_like(text):
     if not text:
         return []
 
-    pattern = r"[A-Z]{5}[0-9]{4}[A-Z]"
-    return re.findall(pattern, text.upper())
+    return _PAN_LIKE_RE.findall(text.upper())
 
 
 def extract_aadhaar_like(text):
@@ -73,8 +283,7 @@ def extract_aadhaar_like(text):
     if not text:
         return []
 
-    pattern = r"\b\d{4}\s?\d{4}\s?\d{4}\b"
-    return re.findall(pattern, text)
+    return _AADHAAR_LIKE_RE.findall(text)
 
 
 def run_ocr_checks(image_path):
@@ -1,14 +1,17 @@
 import re
 
+_PAN_RE = re.compile(r"[A-Z]{5}[0-9]{4}[A-Z]")
+
 def extract_pan_number(text):
-    pattern = r"[A-Z]{5}[0-9]{4}[A-Z]"
-    match = re.search(pattern, text)
+    match = _PAN_RE.search(text)
     return match.group() if match else None
 
 def is_valid_pan(pan_number):
     if not pan_number:
         return False
 
-    # PAN Format rule: ABCDE1234F
-    return bool(re.match(r"[A-Z]{5}[0-9]{4}[A-Z]", pan_number))
+    # PAN Format rule: ABCDE1234F, exactly 10 characters
+    if len(pan_number) != 10:
+        return False
+    return _PAN_RE.fullmatch(pan_number) is not None
 
@@ -1,9 +1,13 @@
+import asyncio
 from .database import users
-from datetime import datetime
-import json
+from datetime import datetime, timezone
+import orjson
 from pathlib import Path
 from bson import ObjectId
 
+SAVE_DIR = Path("kyc_json")
+SAVE_DIR.mkdir(exist_ok=True)
+
 def save_kyc(aadhaar, pan, dob, age_status, face_score, status, email):
     data = {
         "aadhaar": aadhaar,
@@ -13,18 +17,22 @@ def save_kyc(aadhaar, pan, dob, age_status, face_score, status, email):
         "face_score": face_score,
         "kyc_status": status,
         "email": email,
-        "timestamp": datetime.utcnow().isoformat()  # still safe
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
     result = users.insert_one(data)
     data["_id"] = str(result.inserted_id)   # <<< convert ObjectId to string for JSON
 
-    save_dir = Path("kyc_json")
-    save_dir.mkdir(exist_ok=True)
-    
     safe_email = str(email).strip().replace("@", "_at_").replace(".", "_")
-    file_path = save_dir / f"KYC_{safe_email}.json"
-    with open(file_path, "w") as json_file:
-        json.dump(data, json_file, indent=4)
+    file_path = SAVE_DIR / f"KYC_{safe_email}.json"
+    with open(file_path, "wb") as json_file:
+        json_file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     return {"saved": True, "status": status, "file": str(file_path)}
+
+
+async def save_kyc_async(aadhaar, pan, dob, age_status, face_score, status, email):
+    """save_kyc for async handlers: the blocking Mongo insert and file write run in a worker thread."""
+    return await asyncio.to_thread(
+        save_kyc, aadhaar, pan, dob, age_status, face_score, status, email
+    )
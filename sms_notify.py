@@ -1,7 +1,10 @@
+import functools
 import os
 import re
 from typing import Any, Dict
 
+_PHONE_RE = re.compile(r"^\+?[1-9]\d{1,14}$")
+
 
 def _load_env_file(path: str) -> None:
     """Minimal .env loader (no dependency). Does not overwrite existing env vars."""
@@ -9,19 +12,33 @@ def _load_env_file(path: str) -> None:
         if not os.path.exists(path):
             return
         with open(path, "r", encoding="utf-8") as f:
-            for raw in f.readlines():
-                line = raw.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                if key and key not in os.environ:
-                    os.environ[key] = value
+            lines = f.read().splitlines()
+        for raw in lines:
+            line = raw.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip()
+            value = value.strip().strip('"').strip("'")
+            if key and key not in os.environ:
+                os.environ[key] = value
     except Exception:
         return
 
 
+# Load .env once at import rather than on every send
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_load_env_file(os.path.join(_HERE, ".env"))
+_load_env_file(os.path.join(os.path.dirname(_HERE), ".env"))
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(account_sid: str, auth_token: str):
+    """One Twilio client per credential pair, so its HTTP session is reused across sends."""
+    from twilio.rest import Client
+    return Client(account_sid, auth_token)
+
+
 def send_kyc_sms(
     to_phone: str,
     report: Dict[str, Any],
@@ -36,18 +53,13 @@ def send_kyc_sms(
     Returns: {sent: bool, detail?: str, message_sid?: str}
     """
 
-    # Try loading from .env files
-    here = os.path.dirname(os.path.abspath(__file__))
-    _load_env_file(os.path.join(here, ".env"))
-    _load_env_file(os.path.join(os.path.dirname(here), ".env"))
-
     account_sid = os.getenv("TWILIO_ACCOUNT_SID")
     auth_token = os.getenv("TWILIO_AUTH_TOKEN")
     from_phone = os.getenv("TWILIO_PHONE_NUMBER")
 
     # Validate and normalize phone number format
     clean_phone = to_phone.strip().replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-    if not clean_phone or not re.match(r"^\+?[1-9]\d{1,14}$", clean_phone):
+    if not clean_phone or not _PHONE_RE.match(clean_phone):
         return {"sent": False, "detail": f"Invalid phone number format: {to_phone!r}. Use format: +919876543210"}
 
     if not account_sid or not auth_token or not from_phone:
@@ -68,10 +80,7 @@ def send_kyc_sms(
     )
 
     try:
-        from twilio.rest import Client
-        
-        client = Client(account_sid, auth_token)
-        msg = client.messages.create(
+        msg = _get_client(account_sid, auth_token).messages.create(
             body=message,
             from_=from_phone,
             to=clean_phone